@@ -55,11 +55,7 @@ def quote(key, as_key=True):
 
 @functools.lru_cache(CACHE_SIZE)
 def _is_pattern(ops):
-    if not ops:
-        return False
-    if ops[0].is_pattern():
-        return True
-    return _is_pattern(ops[1:])
+    return any(op.is_pattern() for op in ops)
 
 
 def is_pattern(key):
@@ -123,7 +119,7 @@ def get(obj, key, default=None, pattern_default=(), apply_transforms=True):
     """
     ops = parse(key)
     vals = el.gets(ops, obj)
-    if apply_transforms:
+    if apply_transforms and ops.transforms:
         vals = ( ops.apply(v) for v in vals )
     found = tuple(vals)
     if not is_pattern(ops):
@@ -152,7 +148,7 @@ def has(obj, key):
     False
     """
     dummy = object()
-    return get(obj, key, dummy, dummy) is not dummy
+    return next(el.gets(parse(key), obj), dummy) is not dummy
 
 
 def update(obj, key, val, apply_transforms=True):
@@ -178,7 +174,9 @@ def update(obj, key, val, apply_transforms=True):
     {'hello': {}}
     """
     ops = parse(key)
-    return el.updates(ops, obj, ops.apply(val) if apply_transforms else val)
+    if apply_transforms and ops.transforms:
+        val = ops.apply(val)
+    return el.updates(ops, obj, val)
 
 
 def update_multi(obj, keyvalues, apply_transforms=True):
@@ -366,17 +364,17 @@ def apply_multi(obj, patterns):
     >>> apply_multi(d, ('*|float', 'hello|str'))
     {'hello': '7.0', 'there': 9.0}
     """
+    dummy = object()
     seen = {}
     for pat in patterns:
         for ops in el.expands(parse(pat), obj):
             if ops in seen:
                 continue
             seen[ops] = None
-            vals = tuple(el.gets(ops, obj))
-            if not vals:
+            val = next(el.gets(ops, obj), dummy)
+            if val is dummy:
                 continue
-            val = ops.apply(vals[0])
-            obj = el.updates(ops, obj, val)
+            obj = el.updates(ops, obj, ops.apply(val))
     return obj
 
 
@@ -397,10 +395,14 @@ def pluck_multi(obj, patterns, default=None):
     >>> pluck_multi(d, ('hello', 'a.b'))
     (('hello', 7), ('a.b', 'seven'))
     """
-    out = ()
-    for field in expand_multi(obj, patterns):
-        out += ((field, get(obj, field, default=default)),)
-    return out
+    # fetch through the expanded ops rather than re-parsing each assembled field
+    seen = {}
+    for pat in patterns:
+        for ops in el.expands(parse(pat), obj):
+            field = ops.assemble()
+            if field not in seen:
+                seen[field] = get(obj, ops, default=default, apply_transforms=False)
+    return tuple(seen.items())
 
 
 def pluck(obj, pattern, default=None):
@@ -5,7 +5,9 @@ import contextlib
 import copy
 import functools
 import itertools
+import numbers
 import pyparsing as pp
+import sys
 import types
 import re
 
@@ -13,6 +15,10 @@ import re
 _marker = object()
 ANY = _marker
 
+# concrete ops handed out per expanded key; they are never mutated, so one
+# instance per (class, key) can be shared
+CONCRETE_CACHE_SIZE = 1024
+
 
 class Match:
     def __init__(self, val):
@@ -22,6 +28,8 @@ class Match:
 
 
 class Op:
+    __slots__ = ('args', 'parsed', '_hash')
+
     def __init__(self, *args, **kwargs):
         if len(args) == 3 and isinstance(args[2], pp.ParseResults):
             self.args = tuple(args[2].asList())
@@ -29,10 +37,13 @@ class Op:
         else:
             self.args = tuple(args)
             self.parsed = kwargs.get('parsed', ())
+        self._hash = None
     def __repr__(self):
         return f'{self.__class__.__name__}:{self.args}'
     def __hash__(self):
-        return hash(self.args)
+        if self._hash is None:
+            self._hash = hash(self.args)
+        return self._hash
     def __eq__(self, op):
         return self.__class__ == op.__class__ and self.args == op.args
     def scrub(self, node):
@@ -61,29 +72,59 @@ class NOP(metaclass=MetaNOP):
 
 
 class Const(Op):
+    __slots__ = ('_value',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        val = self.args[0]
+        # literals repeat across paths and filters; interned strings let
+        # equality short-circuit on identity
+        self._value = sys.intern(val) if type(val) is str else val
     @property
     def value(self):
-        return self.args[0]
+        return self._value
     def matchable(self, op, specials=False):
         return isinstance(op, Const)
     def matches(self, vals):
-        return (v for v in vals if self.value == v)
+        val = self._value
+        # a keys view answers by hash instead of a linear scan; only a str
+        # can equal a str, so the hit is the key itself
+        if type(val) is str and isinstance(vals, collections.abc.KeysView):
+            return iter((val,) if val in vals else ())
+        return (v for v in vals if val == v)
+    def matches_one(self, val):
+        return self._value == val
 
 
 class Numeric(Const):
-    def is_int(self):
+    __slots__ = ('_is_int',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._is_int = self._test_int(self.args[0])
+        self._value = int(self.args[0]) if self._is_int else float(self.args[0])
+    @staticmethod
+    def _test_int(a):
+        # the parser only hands us ints and floats; a float such as 7.0 stays
+        # a float key, so only an exact int short-circuits
+        t = type(a)
+        if t is int:
+            return True
+        if t is float:
+            return False
         try:
-            return str(self.args[0]) == str(int(self.args[0]))
+            return str(a) == str(int(a))
         except (ValueError, TypeError):
             return False
-    @property
-    def value(self):
-        return int(self.args[0]) if self.is_int() else float(self.args[0])
+    def is_int(self):
+        return self._is_int
     def __repr__(self):
         return f'{self.value}'
 
 
 class NumericQuoted(Numeric):
+    __slots__ = ()
+
     def __repr__(self):
         if self.is_int():
             return super().__repr__()
@@ -91,16 +132,22 @@ class NumericQuoted(Numeric):
 
 
 class Word(Const):
+    __slots__ = ()
+
     def __repr__(self):
         return f'{self.value}'
 
 
 class String(Const):
+    __slots__ = ()
+
     def __repr__(self):
         return f'{repr(self.value)}'
 
 
 class Pattern(Op):
+    __slots__ = ()
+
     def __repr__(self):
         return str(self.value)
     def matchable(self, op, specials=False):
@@ -108,16 +155,26 @@ class Pattern(Op):
 
 
 class Wildcard(Pattern):
+    __slots__ = ()
+
     @property
     def value(self):
         return '*'
     def matches(self, vals):
-        return iter(v for v in vals if v is not NOP)
+        # node keys and sequence indexes never hold NOP, so iterate them
+        # directly; only op values handed over from match() need screening
+        if isinstance(vals, (collections.abc.KeysView, range)):
+            return iter(vals)
+        return (v for v in vals if v is not NOP)
+    def matches_one(self, val):
+        return val is not NOP
     def matchable(self, op, specials=False):
         return isinstance(op, Const) or specials
 
 
 class WildcardFirst(Wildcard):
+    __slots__ = ()
+
     @property
     def value(self):
         return '*?'
@@ -130,30 +187,39 @@ class WildcardFirst(Wildcard):
 
 
 class Regex(Pattern):
+    __slots__ = ('_pattern',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pattern = re.compile(self.args[0])
     @property
     def value(self):
         return f'/{self.args[0]}/'
     @property
     def pattern(self):
-        return re.compile(self.args[0])
+        return self._pattern
     def matches(self, vals):
-        vals = (v for v in vals if v is not NOP)
-        vals = {v if isinstance(v, (str, bytes)) else str(v): v for v in vals}
-        iterable = (self.pattern.fullmatch(v) for v in vals)
-        # we want to regex match numerics as strings but return numerics
-        # unless they were transformed, of course
-        for m in iterable:
+        fullmatch = self._pattern.fullmatch
+        for v in vals:
+            if v is NOP:
+                continue
+            m = fullmatch(v if isinstance(v, (str, bytes)) else str(v))
             if not m:
                 continue
-            if m[0] != m.string:
-                yield m[0]
-            else:
-                yield vals[m.string]
+            # we want to regex match numerics as strings but return numerics
+            # unless they were transformed, of course
+            yield m[0] if m[0] != m.string else v
+    def matches_one(self, val):
+        if val is NOP:
+            return False
+        return bool(self._pattern.fullmatch(val if isinstance(val, (str, bytes)) else str(val)))
     def matchable(self, op, specials=False):
         return isinstance(op, Const) or (specials and isinstance(op, (Special, Regex)))
 
 
 class RegexFirst(Regex):
+    __slots__ = ()
+
     @property
     def value(self):
         return f'/{self.args[0]}/?'
@@ -166,6 +232,8 @@ class RegexFirst(Regex):
 
 
 class Special(Op):
+    __slots__ = ()
+
     @property
     def value(self):
         return self.args[0]
@@ -176,6 +244,8 @@ class Special(Op):
 
 
 class Appender(Special):
+    __slots__ = ()
+
     @property
     def value(self):
         return '+'
@@ -186,12 +256,16 @@ class Appender(Special):
 
 
 class AppenderUnique(Appender):
+    __slots__ = ()
+
     @property
     def value(self):
         return '+?'
 
 
 class FilterOp(Op):
+    __slots__ = ()
+
     def is_pattern(self):
         return False
 
@@ -206,34 +280,56 @@ class FilterOp(Op):
 
 
 class FilterKeyValue(FilterOp):
+    __slots__ = ('kv', '_lookups')
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.kv = tuple((k, v) for k, v in self.args)
+        # concrete keys are looked up directly rather than scanned for; a
+        # repeated pair cannot change a disjunction so test it only once
+        self._lookups = tuple((k.value if isinstance(k, Const) else _marker, k, v)
+                              for k, v in dict.fromkeys(self.kv))
     def __hash__(self):
-        return hash(self.kv)
+        if self._hash is None:
+            self._hash = hash(self.kv)
+        return self._hash
     def __repr__(self):
         return ','.join(f'{k}={v}' for k, v in self.kv)
 
     def is_filtered(self, node):
-        if not hasattr(node, 'keys'):
+        if node_kind(node) != KIND_MAPPING:
             return False
         # disjunctive evaluation
-        for k, v in self.kv:
-            for km in k.matches(node.keys()):
-                for vm in v.matches((node[km],)):
+        keys = None
+        for key, k, v in self._lookups:
+            if key is not _marker:
+                if key in node and v.matches_one(node[key]):
+                    return True
+                continue
+            if keys is None:
+                keys = node.keys()
+            for km in k.matches(keys):
+                if v.matches_one(node[km]):
                     return True
         return False
 
     def filtered(self, items):
         return (item for item in items if self.is_filtered(item))
 
+    def cost(self):
+        """
+        Rough relative price of is_filtered: constants 0, wildcards 1, regexes 2
+        """
+        return sum(isinstance(o, Pattern) + isinstance(o, Regex) for kv in self.kv for o in kv)
+
     def matchable(self, op):
         return isinstance(op, FilterKeyValue)
 
     def match(self, op):
         if not self.matchable(op):
             return None
-        r = ()
+        # insertion-ordered set of matched pairs
+        r = {}
         for k, v in self.kv:
             found = False
             for ik, iv in op.kv:
@@ -243,8 +339,7 @@ class FilterKeyValue(FilterOp):
                 mv = next(v.matches((iv.value,)), _marker)
                 if _marker in (mk, mv):
                     continue
-                if (mk, mv) not in r:
-                    r += ((mk, mv),)
+                r[(mk, mv)] = None
                 found = True
             if not found:
                 return None
@@ -252,28 +347,101 @@ class FilterKeyValue(FilterOp):
 
 
 class FilterKeyValueFirst(FilterKeyValue):
+    __slots__ = ()
+
     def matchable(self, op):
         return isinstance(op, FilterKeyValueFirst)
 
     def filtered(self, items):
-        for item in super().filtered(items):
-            yield item
-            break
+        item = next(super().filtered(items), _marker)
+        return iter(() if item is _marker else (item,))
 
 
 #
 #
 #
+# node kinds, decided once per type and seeded with the builtins
+KIND_MAPPING, KIND_SEQUENCE, KIND_OTHER = range(3)
+_NODE_KINDS = dict.fromkeys((dict, collections.OrderedDict, collections.defaultdict), KIND_MAPPING)
+_NODE_KINDS.update(dict.fromkeys((list, tuple, str, bytes), KIND_SEQUENCE))
+_NODE_KINDS.update(dict.fromkeys((int, float, bool, type(None)), KIND_OTHER))
+
+
+def node_kind(node):
+    """
+    KIND_MAPPING if keyed like a dict, KIND_SEQUENCE if an indexable, sized
+    sequence, otherwise KIND_OTHER
+    """
+    t = type(node)
+    kind = _NODE_KINDS.get(t)
+    if kind is None:
+        if hasattr(t, 'keys'):
+            kind = KIND_MAPPING
+        elif hasattr(t, '__getitem__') and hasattr(t, '__len__'):
+            kind = KIND_SEQUENCE
+        else:
+            kind = KIND_OTHER
+        _NODE_KINDS[t] = kind
+    return kind
+
+
 def itemof(node, val):
     return val if isinstance(node, (str, bytes)) else node.__class__([val])
 
 
+def splice_out(node, idxs):
+    """
+    Copy of sequence node without the ascending, non-negative indexes idxs;
+    the kept runs are sliced out whole rather than walked item by item
+    """
+    pieces = []
+    start = 0
+    for idx in idxs:
+        if idx > start:
+            pieces.append(node[start:idx])
+        start = idx + 1
+    pieces.append(node[start:])
+    if isinstance(node, (str, bytes)):
+        return node[:0].join(pieces)
+    return node.__class__(itertools.chain.from_iterable(pieces))
+
+
 
 class CmdOp(Op):
+    __slots__ = ('_filters', '_predicate')
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.filters = ()
 
+    @property
+    def filters(self):
+        return self._filters
+
+    @filters.setter
+    def filters(self, filters):
+        self._filters = filters
+        self._predicate = self._compile_predicate(filters)
+
+    @staticmethod
+    def _compile_predicate(filters):
+        """
+        Fold plain key/value filters into one item -> bool callable, cheapest
+        first; None when filters must chain because a first-match (`?`)
+        filter makes order significant, or when there is nothing to test
+        """
+        if not filters or any(isinstance(f, FilterKeyValueFirst) for f in filters):
+            return None
+        preds = tuple(f.is_filtered for f in sorted(dict.fromkeys(filters), key=lambda f: f.cost()))
+        if len(preds) == 1:
+            return preds[0]
+        def _predicate(item):
+            for pred in preds:
+                if not pred(item):
+                    return False
+            return True
+        return _predicate
+
     def match(self, op):
         results = ()
         for f, of in zip(self.filters, op.filters):
@@ -286,12 +454,17 @@ class CmdOp(Op):
         return results
 
     def filtered(self, items):
+        predicate = self._predicate
+        if predicate is not None:
+            return filter(predicate, items)
         for f in self.filters:
             items = f.filtered(items)
         return items
 
 
 class Empty(CmdOp):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.filters = self.args
@@ -321,9 +494,11 @@ class Empty(CmdOp):
 
 
 class Key(CmdOp):
+    __slots__ = ('op', '_is_pattern', '_direct', '_operator')
+
     @classmethod
+    @functools.lru_cache(CONCRETE_CACHE_SIZE, typed=True)
     def concrete(cls, val):
-        import numbers
         if isinstance(val, numbers.Number):
             return cls(NumericQuoted(val))
         return cls(Word(val))
@@ -332,43 +507,86 @@ class Key(CmdOp):
         super().__init__(*args, **kwargs)
         self.op = self.args[0]
         self.filters = self.args[1:]
+        self._is_pattern = isinstance(self.op, Pattern)
+        # the one key a plain, unfiltered lookup reads, decided once here
+        # rather than on every items() call
+        if self._is_pattern or self._filters:
+            self._direct = _marker
+        else:
+            self._direct = self.op.value
+        self._operator = None
 
     def is_pattern(self):
-        return isinstance(self.op, Pattern)
+        return self._is_pattern
 
     def __repr__(self):
         return '.'.join(repr(a) for a in self.args)
 
-    def operator(self, top=False):
+    def _format(self):
         iterable = itertools.chain((quote(self.op.value),), (repr(f) for f in self.filters))
-        s = '.'.join(iterable)
+        return '.'.join(iterable)
+
+    def _formatted(self):
+        # ops are immutable once built, and concrete ones are shared across
+        # expansions, so the quoted form is worth keeping
+        s = self._operator
+        if s is None:
+            s = self._operator = self._format()
+        return s
+
+    def operator(self, top=False):
+        s = self._formatted()
         if top:
             return s
         return '.' + s
 
-    def _items(self, node, keys):
+    def _pairs(self, node, keys, present=False):
+        """
+        (key, value) for each key found in node; `present` promises every key
+        was drawn from node itself
+        """
+        if present:
+            return [(k, node[k]) for k in keys]
+        return self._lookup(node, keys)
+
+    def _lookup(self, node, keys):
+        out = []
+        for k in keys:
+            try:
+                out.append((k, node[k]))
+            except (TypeError, KeyError, IndexError):
+                continue
+        return out
+
+    def _items(self, node, keys, present=False):
+        items = self._pairs(node, keys, present)
+        predicate = self._predicate
+        if predicate is not None:
+            return [(k, v) for k, v in items if predicate(v)]
+        if not self.filters:
+            return items
+
+        # order-sensitive filters consume the value stream, so track which
+        # key the filtered value was drawn from
         curkey = None
 
         def _values():
             nonlocal curkey
-            for k in keys:
-                try:
-                    v = node[k]
-                except (TypeError, KeyError, IndexError):
-                    continue
-                curkey = k
+            for curkey, v in items:
                 yield v
 
-        def _items():
-            for v in self.filtered(_values()):
-                yield (curkey, v)
-
-        return _items()
+        return ((curkey, v) for v in self.filtered(_values()))
 
     def items(self, node):
-        if not hasattr(node, 'keys'):
+        k = self._direct
+        if type(k) is str and type(node) is dict:
+            # plain `.a.b` access on a dict is a single hashed lookup; limited
+            # to str keys for the reason given in Const.matches
+            v = node.get(k, _marker)
+            return () if v is _marker else ((k, v),)
+        if node_kind(node) != KIND_MAPPING:
             return ()
-        return self._items(node, self.op.matches(node.keys()))
+        return self._items(node, self.op.matches(node.keys()), present=True)
 
     def keys(self, node):
         return (k for k, _ in self.items(node))
@@ -377,10 +595,10 @@ class Key(CmdOp):
         return (v for _, v in self.items(node))
 
     def is_empty(self, node):
-        return not tuple(self.keys(node))
+        return next(iter(self.items(node)), _marker) is _marker
 
     def default(self):
-        if self.is_pattern():
+        if self._is_pattern:
             return {}
         if not self.filters:
             return {self.op.value: None}
@@ -414,77 +632,88 @@ class Key(CmdOp):
         iterable = itertools.chain(iterable, ((key, val),))
         return type(node)(iterable)
     def upsert(self, node, val):
-        if not self.is_pattern():
+        if not self._is_pattern:
             return self.update(node, self.op.value, val)
 
-        keys = tuple(self.keys(node))
-        iterable = ((k, node[k]) for k in node if k not in keys)
-        items = itertools.chain(iterable, ((k, val) for k in keys))
+        keys = dict.fromkeys(self.keys(node), val)
+        if not keys:
+            return node
+        if type(node) is dict:
+            node.update(keys)
+            return node
         try:
-            for k, v in items:
-                node[k] = v
+            for k in keys:
+                node[k] = val
             return node
         except TypeError:
             pass
-        return type(node)(items)
+        return type(node)((k, val if k in keys else v) for k, v in node.items())
 
-    def pop(self, node, key):
+    def _discard(self, node, keys):
+        """
+        node without keys: deleted in place where node allows it, otherwise
+        rebuilt once
+        """
         try:
-            del node[key]
+            for k in keys:
+                del node[k]
             return node
         except KeyError:
             return node
         except TypeError:
             pass
-        return type(node)((k, v) for k, v in node.items() if k != key)
+        excluded = set(keys)
+        return type(node)((k, v) for k, v in node.items() if k not in excluded)
+    def pop(self, node, key):
+        return self._discard(node, (key,))
     def remove(self, node, val):
-        for k,v in self.items(node):
-            if val is ANY or v == val:
-                return self.pop(node, k)
-        return node
+        keys = [k for k, v in self.items(node) if val is ANY or v == val]
+        if not keys:
+            return node
+        return self._discard(node, keys)
 
 
 class Attr(Key):
+    __slots__ = ()
+
     @classmethod
+    @functools.lru_cache(CONCRETE_CACHE_SIZE, typed=True)
     def concrete(cls, val):
         return cls(Word(val))
 
     def __repr__(self):
         return '@' + '.'.join(repr(a) for a in self.args)
 
-    def operator(self, top=False):
-        iterable = itertools.chain((quote(self.op.value),), (repr(f) for f in self.filters))
-        return '@' + '.'.join(iterable)
-
-    def _items(self, node, keys):
-        curkey = None
+    def _format(self):
+        return '@' + super()._format()
 
-        def _values():
-            nonlocal curkey
-            for k in keys:
-                try:
-                    v = getattr(node, k)
-                except AttributeError:
-                    continue
-                curkey = k
-                yield v
+    def operator(self, top=False):
+        return self._formatted()
 
-        def _items():
-            for v in self.filtered(_values()):
-                yield (curkey, v)
+    def _pairs(self, node, keys, present=False):
+        if present:
+            return [(k, getattr(node, k)) for k in keys]
+        return self._lookup(node, keys)
 
-        return _items()
+    def _lookup(self, node, keys):
+        out = []
+        for k in keys:
+            try:
+                out.append((k, getattr(node, k)))
+            except AttributeError:
+                continue
+        return out
 
     def items(self, node):
         try:
             keys = node.__dict__.keys()
         except AttributeError:
-            keys = ()
-        return self._items(node, self.op.matches(keys))
+            return ()
+        return self._items(node, self.op.matches(keys), present=True)
 
     def default(self):
-        o = types.SimpleNamespae()
-        if self.is_pattern():
+        o = types.SimpleNamespace()
+        if self._is_pattern:
             return o
         if not self.filters:
             setattr(o, self.op.value, None)
@@ -497,31 +726,27 @@ class Attr(Key):
         setattr(node, key, val)
         return node
     def upsert(self, node, val):
-        if not self.is_pattern():
+        if not self._is_pattern:
             return self.update(node, self.op.value, val)
-        keys = tuple(self.keys(node))
-        iterable = ((k, getattr(node, k)) for k in node if k not in keys)
-        items = itertools.chain(iterable, ((k, val) for k in keys))
-        for k, v in items:
-            setattr(node, k, v)
+        for k in tuple(self.keys(node)):
+            setattr(node, k, val)
         return node
 
-    def pop(self, node, key):
-        try:
-            delattr(node, key)
-        except AttributeError:
-            return node
-    def remove(self, node, val):
-        for k,v in self.items(node):
-            if val is ANY or v == val:
-                return self.pop(node, k)
+    def _discard(self, node, keys):
+        for k in keys:
+            try:
+                delattr(node, k)
+            except AttributeError:
+                pass
         return node
 
 
 class Slot(Key):
+    __slots__ = ()
+
     @classmethod
+    @functools.lru_cache(CONCRETE_CACHE_SIZE, typed=True)
     def concrete(cls, val):
-        import numbers
         if isinstance(val, numbers.Number):
             return cls(Numeric(val))
         return String(val)
@@ -529,22 +754,31 @@ class Slot(Key):
     def __repr__(self):
         return '[' + super().__repr__()  + ']'
 
-    def operator(self, top=False):
+    def _format(self):
         iterable = (repr(a) for a in self.filters)
         if self.op is not None:
             iterable = itertools.chain((quote(self.op.value, as_key=False),), iterable)
         return '[' + '.'.join(iterable) + ']'
 
+    def operator(self, top=False):
+        return self._formatted()
+
     def items(self, node):
-        if hasattr(node, 'keys'):
+        kind = node_kind(node)
+        if kind == KIND_MAPPING:
             return super().items(node)
 
-        if self.is_pattern():
-            keys = self.op.matches(idx for idx, _ in enumerate(node))
-        else:
-            keys = (self.op.value,)
-
-        return self._items(node, keys)
+        if self._is_pattern:
+            if kind != KIND_SEQUENCE:
+                return ()
+            return self._items(node, self.op.matches(range(len(node))), present=True)
+        k = self._direct
+        if k is not _marker and kind == KIND_SEQUENCE:
+            try:
+                return ((k, node[k]),)
+            except (TypeError, IndexError):
+                return ()
+        return self._items(node, (self.op.value,))
 
     def default(self):
         if isinstance(self.op, Numeric) and self.op.is_int():
@@ -552,7 +786,7 @@ class Slot(Key):
         return super().default()
 
     def update(self, node, key, val):
-        if hasattr(node, 'keys'):
+        if node_kind(node) == KIND_MAPPING:
             return super().update(node, key, val)
         val = self.default() if val is ANY else val
         if len(node) <= key:
@@ -560,78 +794,67 @@ class Slot(Key):
             return node
         try:
             node[key] = val
+            return node
         except TypeError:
-            node = node[:key] + itemof(node, val) + node[key+1:]
-        return node
+            pass
+        if isinstance(node, (str, bytes)):
+            if key < 0:
+                key += len(node)
+            return node[:key] + val + node[key+1:]
+        # one copy and one constructor call, rather than two slices and two
+        # concatenations
+        items = list(node)
+        items[key] = val
+        return type(node)(items)
 
     def upsert(self, node, val):
-        if hasattr(node, 'keys'):
+        if node_kind(node) == KIND_MAPPING:
             return super().upsert(node, val)
         val = self.default() if val is ANY else val
-        if self.is_pattern():
+        if self._is_pattern:
             keys = tuple(self.keys(node))
         else:
             keys = (self.op.value,)
-        update_keys = tuple(k for k in keys if k < len(node))
-        append_keys = tuple(k for k in keys if k >= len(node))
+        n = len(node)
+        update_keys = [k for k in keys if k < n]
+        extra = len(keys) - len(update_keys)
         try:
             for k in update_keys:
                 node[k] = val
-            node += type(node)(val for _ in append_keys)
+            if extra:
+                node += itemof(node, val) * extra
             return node
         except TypeError:
             pass
+        text = isinstance(node, (str, bytes))
+        # str/bytes are split into one-item slices so bytes keep bytes pieces
+        items = [node[i:i+1] for i in range(n)] if text else list(node)
+        for k in update_keys:
+            items[k] = val
+        items.extend(itertools.repeat(val, extra))
+        if text:
+            return node[:0].join(items)
+        return type(node)(items)
 
-        def _gen():
-            for k in node:
-                if k in update_keys:
-                    yield val
-                else:
-                    yield node[k]
-
-        node = type(node)(_gen())
-        node += type(node)(val for _ in append_keys)
-        return node
-
-    def pop(self, node, key):
-        if hasattr(node, 'keys'):
-            return super().pop(node, key)
-        try:
-            del node[key]
+    def _discard(self, node, keys):
+        if node_kind(node) == KIND_MAPPING:
+            return super()._discard(node, keys)
+        n = len(node)
+        idxs = sorted({k % n for k in keys if -n <= k < n})
+        if not idxs:
             return node
-        except (KeyError, IndexError):
+        try:
+            for k in reversed(idxs):
+                del node[k]
             return node
         except TypeError:
             pass
-        return type(node)(v for i,v in enumerated(node) if i != key)
-    def remove(self, node, val):
-        if hasattr(node, 'keys'):
-            return super().remove(node, val)
-        keys = tuple(self.keys(node))
-        if val is ANY:
-            if hasattr(node, '__delitem__'):
-                for k in reversed(keys):
-                    del node[k]
-                return node
-            return node.__class__(v for i, v in enumerated(node) if i not in keys)
-        if hasattr(node, 'remove'):
-            try:
-                node.remove(val)
-            except (ValueError, KeyError):
-                pass
-            return node
-        try:
-            if hasattr(node, 'index'):
-                idx = node.index(val)
-            else:
-                idx = next(idx for idx, v in enumerate(node) if val == v)
-        except (ValueError, StopIteration):
-            return node
-        node = node[:idx] + node[idx+1:]
-        return node
+        return splice_out(node, idxs)
 
 
 class SlotSpecial(Slot):
+    __slots__ = ()
+
     @classmethod
     def concrete(cls, val):
         return cls(val)
@@ -665,6 +888,8 @@ class SlotSpecial(Slot):
 
 
 class SliceFilter(CmdOp):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.filters = self.args
@@ -707,17 +932,24 @@ class SliceFilter(CmdOp):
         if not removes:
             return node
 
-        def _build():
-            iterable = (v for idx, v in enumerate(node) if idx not in removes)
-            return type(node)(iterable)
+        excluded = set(removes)
 
-        # if we're removing by value, then we need to see _if_ new list will equal
-        new = None
+        # removing by value only happens if what remains equals it; compare
+        # against a copy built by iteration, which any sequence supports
         if val is not ANY:
-            new = _build()
-            if new != val:
+            if isinstance(node, (str, bytes)):
+                kept = splice_out(node, removes)
+            else:
+                kept = type(node)(v for idx, v in enumerate(node) if idx not in excluded)
+            if kept != val:
                 return node
 
+        # a plain list takes one slice assignment rather than shifting its
+        # tail once per removed index
+        if type(node) is list:
+            node[:] = [v for idx, v in enumerate(node) if idx not in excluded]
+            return node
+
         # attempt to mutate
         try:
             for idx in reversed(removes):
@@ -727,17 +959,20 @@ class SliceFilter(CmdOp):
             pass
 
         # otherwise we can't mutate, so generate a new one
-        return _build() if new is not None else new
+        return splice_out(node, removes)
 
     def pop(self, node, key):
         return self.remove(node, ANY)
 
 
 class Slice(CmdOp):
+    __slots__ = ('_slice',)
+
     @classmethod
     def concrete(cls, val):
         o = cls()
         o.args = (val.start, val.stop, val.step)
+        o._slice = o._fixed()
         return o
     @classmethod
     def munge(cls, toks):
@@ -754,6 +989,14 @@ class Slice(CmdOp):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.args = tuple(self.munge(self.args))
+        self._slice = self._fixed()
+    def _fixed(self):
+        """
+        The slice object when it doesn't depend on the node, i.e. no '+'
+        """
+        if '+' in self.args:
+            return None
+        return slice(*self.args)
     def __repr__(self):
         def s(a):
             return quote(a, False) if a is not None else ''
@@ -771,6 +1014,8 @@ class Slice(CmdOp):
     def operator(self, top=False):
         return str(self)
     def slice(self, node=None):
+        if self._slice is not None:
+            return self._slice
         args = self.args
         if node is not None:
             args = ( len(node) if a == '+' else a for a in self.args )
@@ -801,7 +1046,11 @@ class Slice(CmdOp):
     def values(self, node):
         return (v for _, v in self.items(node))
     def is_empty(self, node):
-        return not node[self.slice(node)]
+        s = self.slice(node)
+        if node_kind(node) == KIND_SEQUENCE:
+            # size the slice off the index range instead of copying it out
+            return not range(len(node))[s]
+        return not node[s]
     def default(self):
         return []
     def match(self, op, specials=False):
@@ -813,24 +1062,19 @@ class Slice(CmdOp):
     def update(self, node, key, val):
         if node[key] == val:
             return node
+        val = self.default() if val is ANY else val
         try:
-            node[key] = self.default() if val is ANY else val
+            node[key] = val
             return node
         except TypeError:
             pass
-        r = range(key.start, key.stop, key.step)
-        idx = 0
-        out = []
-        for i,v in enumerate(node):
-            if i not in range:
-                out.append(v)
-                continue
-            if idx < len(val):
-                out.append(val[idx])
-                idx += 1
-        if hasattr(node, 'join'):
-            return node.__class__().join(out)
-        return node.__class__(out)
+        # apply the same slice assignment to a list copy, so immutable nodes
+        # follow list semantics
+        items = list(node)
+        items[key] = val
+        if isinstance(node, str):
+            return node.__class__().join(items)
+        return node.__class__(items)
     def upsert(self, node, val):
         return self.update(node, self.slice(node), val)
 
@@ -840,11 +1084,10 @@ class Slice(CmdOp):
             return node
         except TypeError:
             pass
-        r = range(key.start, key.stop, key.step)
-        iterable = ( v for i,v in enumerate(node) if i not in r )
-        if hasattr(node, 'join'):
-            return node.__class__().join(iterable)
-        return node.__class__(iterable)
+        r = range(len(node))[key]
+        if r.step < 0:
+            r = r[::-1]
+        return splice_out(node, r)
     def remove(self, node, val):
         if val is ANY:
             return self.pop(node, self.slice(node))
@@ -855,6 +1098,8 @@ class Slice(CmdOp):
 
 
 class Invert(CmdOp):
+    __slots__ = ()
+
     @classmethod
     def concrete(cls, val):
         return cls(val)
@@ -887,7 +1132,10 @@ class rdoc(str):
 
 
 class Dotted:
+    __slots__ = ('ops', 'transforms', '_fns', '_hash')
     _registry = {}
+    # bumped on every register() so parsed pipelines know to re-resolve
+    _generation = 0
 
     def registry(self):
         return self._registry
@@ -895,17 +1143,29 @@ class Dotted:
     @classmethod
     def register(cls, name, fn):
         cls._registry[name] = fn
+        Dotted._generation += 1
 
     def __init__(self, results):
         self.ops = tuple(results['ops'])
-        self.transforms = tuple(tuple(r) for r in results.get('transforms', ()))
+        transforms = results.get('transforms', ())
+        # a tuple comes from another Dotted (e.g. expands) and is already in
+        # canonical form; parse results still need converting
+        if type(transforms) is not tuple:
+            transforms = tuple(tuple(r) for r in transforms)
+        self.transforms = transforms
+        # fns are resolved on first apply and again only if a transform was
+        # registered since, so late registrations are still honoured
+        self._fns = (None, ())
+        self._hash = None
 
     def assemble(self, start=0):
         return assemble(self, start)
     def __repr__(self):
         return f'{self.__class__.__name__}({list(self.ops)}, {list(self.transforms)})'
     def __hash__(self):
-        return hash((self.ops, self.transforms))
+        if self._hash is None:
+            self._hash = hash((self.ops, self.transforms))
+        return self._hash
     def __len__(self):
         return len(self.ops)
     def __iter__(self):
@@ -914,9 +1174,15 @@ class Dotted:
         return self.ops == ops.ops and self.transforms == ops.transforms
     def __getitem__(self, key):
         return self.ops[key]
+    def _resolve(self):
+        generation, fns = self._fns
+        if generation != Dotted._generation:
+            registry = self._registry
+            fns = tuple((registry[name], tuple(args)) for name, *args in self.transforms)
+            self._fns = (Dotted._generation, fns)
+        return fns
     def apply(self, val):
-        for name,*args in self.transforms:
-            fn = self._registry[name]
+        for fn, args in self._resolve():
             val = fn(val, *args)
         return val
 
@@ -964,75 +1230,154 @@ def transform(name):
     return _fn
 
 
+def _opseq(ops):
+    """
+    Ops as an indexable tuple; a Dotted already holds one from construction
+    """
+    return ops.ops if isinstance(ops, Dotted) else tuple(ops)
+
+
+def _build_default(ops, i):
+    # fold right to left: each op's default wraps the one built after it
+    j = len(ops) - 1
+    built = ops[j].default()
+    while j > i:
+        j -= 1
+        cur = ops[j]
+        built = cur.upsert(cur.default(), built)
+    return built
+
+
 def build_default(ops):
-    cur, *ops = ops
-    built = cur.default()
-    if not ops:
-        return built
-    return cur.upsert(built, build_default(ops))
+    return _build_default(_opseq(ops), 0)
 
 
-def build(ops, node, deepcopy=True):
-    cur, *ops = ops
+# exact types deepcopy would hand back unchanged
+_ATOMIC_TYPES = frozenset((type(None), bool, int, float, complex, str, bytes))
+
+
+def _deepcopy(v, memo):
+    """
+    copy.deepcopy, with plain dicts and lists copied directly; anything else
+    goes to copy.deepcopy with the same memo so sharing and cycles survive
+    """
+    t = type(v)
+    if t in _ATOMIC_TYPES:
+        return v
+    r = memo.get(id(v), _marker)
+    if r is not _marker:
+        return r
+    if t is dict:
+        r = memo[id(v)] = {}
+        for k, x in v.items():
+            r[k] = _deepcopy(x, memo)
+        return r
+    if t is list:
+        r = memo[id(v)] = []
+        r.extend([_deepcopy(x, memo) for x in v])
+        return r
+    return copy.deepcopy(v, memo)
+
+
+def _build(ops, i, node, deepcopy):
+    cur = ops[i]
+    update = cur.update
     built = node.__class__()
-    for k,v in cur.items(node):
-        if not ops:
-            built = cur.update(built, k, copy.deepcopy(v) if deepcopy else v)
+    if i + 1 < len(ops):
+        for k,v in cur.items(node):
+            built = update(built, k, _build(ops, i + 1, v, deepcopy))
+    elif deepcopy:
+        for k,v in cur.items(node):
+            if type(v) not in _ATOMIC_TYPES:
+                v = _deepcopy(v, {})
+            built = update(built, k, v)
+    else:
+        for k,v in cur.items(node):
+            built = update(built, k, v)
+    return built or _build_default(ops, i)
+
+
+def build(ops, node, deepcopy=True):
+    return _build(_opseq(ops), 0, node, deepcopy)
+
+
+def _gets(ops, i, node):
+    # walk with an explicit stack of (depth, pending nodes) rather than
+    # one generator frame per op; depth-first so results keep their order
+    last = len(ops) - 1
+    stack = [(i, iter((node,)))]
+    push = stack.append
+    pop = stack.pop
+    while stack:
+        i, nodes = stack[-1]
+        node = next(nodes, _marker)
+        if node is _marker:
+            pop()
+            continue
+        cur = ops[i]
+        if type(cur) is Invert:
+            push((i + 1, iter((node,))))
+        elif i == last:
+            yield from cur.values(node)
         else:
-            built = cur.update(built, k, build(ops, v, deepcopy=deepcopy))
-    return built or build_default([cur]+ops)
+            push((i + 1, iter(cur.values(node))))
 
 
 def gets(ops, node):
-    cur, *ops = ops
-    if isinstance(cur, Invert):
-        yield from gets(ops, node)
-        return
-    values = cur.values(node)
-    if not ops:
-        yield from values
-        return
-    for v in values:
-        yield from gets(ops, v)
+    return _gets(_opseq(ops), 0, node)
 
 
-def updates(ops, node, val, has_defaults=False):
-    cur, *ops = ops
-    if isinstance(cur, Invert):
-        return removes(ops, node, val)
-    if not ops:
+def _updates(ops, i, node, val, has_defaults=False):
+    cur = ops[i]
+    if type(cur) is Invert:
+        return _removes(ops, i + 1, node, val)
+    if i + 1 == len(ops):
         return cur.upsert(node, val)
     if cur.is_empty(node) and not has_defaults:
-        built = updates(ops, build_default(ops), val, True)
+        built = _updates(ops, i + 1, _build_default(ops, i + 1), val, True)
         return cur.upsert(node, built)
+    update = cur.update
     for k, v in cur.items(node):
-        node = cur.update(node, k, updates(ops, v, val, has_defaults))
+        node = update(node, k, _updates(ops, i + 1, v, val, has_defaults))
     return node
 
 
-def removes(ops, node, val=ANY):
-    cur, *ops = ops
-    if isinstance(cur, Invert):
+def updates(ops, node, val, has_defaults=False):
+    return _updates(_opseq(ops), 0, node, val, has_defaults)
+
+
+def _removes(ops, i, node, val=ANY):
+    cur = ops[i]
+    if type(cur) is Invert:
         assert val is not ANY, 'Value required'
-        return updates(ops, node, val)
-    if not ops:
+        return _updates(ops, i + 1, node, val)
+    if i + 1 == len(ops):
         return cur.remove(node, val)
+    update = cur.update
     for k,v in cur.items(node):
-        node = cur.update(node, k, removes(ops, v, val))
+        node = update(node, k, _removes(ops, i + 1, v, val))
     return node
 
 
+def removes(ops, node, val=ANY):
+    return _removes(_opseq(ops), 0, node, val)
+
+
 def expands(ops, node):
-    def _expands(ops, node):
-        cur, *ops = ops
-        if not ops:
-            yield from ( (cur.concrete(k),) for k in cur.keys(node) )
+    def _expands(i, node):
+        cur = seq[i]
+        concrete = cur.concrete
+        if i + 1 == n:
+            yield from ( (concrete(k),) for k in cur.keys(node) )
             return
         for k,v in cur.items(node):
-            for m in _expands(ops, v):
-                yield (cur.concrete(k),) + m
+            head = (concrete(k),)
+            for m in _expands(i + 1, v):
+                yield head + m
+    seq = _opseq(ops)
+    n = len(seq)
     return ( Dotted({'ops': r, 'transforms': ops.transforms}) for r \
-            in _expands(ops, node) )
+            in _expands(0, node) )
 
 # default transforms
 from . import transforms
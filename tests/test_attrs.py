@@ -41,3 +41,10 @@ def test_attr_remove():
     # try removing again
     dotted.remove(ns, '@hello')
     assert not hasattr(ns, 'hello')
+
+
+def test_attr_update_pattern():
+    ns = types.SimpleNamespace(hello='there', good='bye')
+    r = dotted.update(ns, '@*', 7)
+    assert r is ns
+    assert (ns.hello, ns.good) == (7, 7)
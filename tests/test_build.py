@@ -0,0 +1,27 @@
+import dotted
+from dotted import elements as el
+
+
+def test_build_copies_mutable_leaves():
+    d = {'a': {'b': [1, 2], 'c': 'three'}}
+    r = el.build(dotted.parse('a.*'), d)
+    assert r == d
+    r['a']['b'].append(3)
+    assert d['a']['b'] == [1, 2]
+
+
+def test_build_shares_when_not_deepcopy():
+    d = {'a': {'b': [1, 2]}}
+    r = el.build(dotted.parse('a.b'), d, deepcopy=False)
+    assert r['a']['b'] is d['a']['b']
+
+
+def test_build_deepcopy_keeps_sharing_and_cycles():
+    shared = [1]
+    loop = []
+    loop.append(loop)
+    d = {'a': {'x': shared, 'y': shared}, 'b': loop}
+    r = el.build(dotted.parse('*'), d)
+    assert r['a']['x'] is r['a']['y']
+    assert r['a']['x'] is not shared
+    assert r['b'][0] is r['b']
@@ -215,3 +215,32 @@ def test_get_filter_keyvaluefirst_on_list():
 
     r = dotted.get(d, '*?[hello="there"?]')
     assert r == ([{'id': 1, 'hello': 'there'}],)
+
+
+def test_get_filter_keyvalue_conjunction():
+    d = {
+        'a': [{'id': 1, 'hello': 'there'}, {'id': 2, 'hello': 'there'}],
+        'b': [{'id': 3, 'hello': 'there'}, {'id': 4, 'hello': 'bye'}],
+    }
+
+    r = dotted.get(d, '*[id=/[23]/.hello="there"]')
+    assert r == ([{'id': 2, 'hello': 'there'}], [{'id': 3, 'hello': 'there'}])
+
+    # first-match filters still apply in order
+    r = dotted.get(d, 'a[hello="there"?.id=2]')
+    assert r == []
+
+
+def test_remove_filter_keyvalue_on_tuple():
+    d = {'a': ({'id': 1}, {'id': 2}, {'id': 1})}
+
+    r = dotted.remove(d, 'a[id=1]')
+    assert r == {'a': ({'id': 2},)}
+
+
+def test_remove_filter_keyvalue_on_deque():
+    import collections
+    d = {'a': collections.deque([{'id': 1}, {'id': 2}])}
+
+    r = dotted.remove(d, 'a[id=1]')
+    assert r == {'a': collections.deque([{'id': 2}])}
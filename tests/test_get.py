@@ -11,3 +11,31 @@ def test_get_key():
 
 def test_get_slot():
     r = dotted.get({}, 'hello[*]')
+
+
+def test_get_nested_pattern_order():
+    d = {'a': [{'b': [1, 2]}, {'c': 0}, {'b': [3]}]}
+    r = dotted.get(d, 'a[*].b[*]')
+    assert r == (1, 2, 3)
+
+
+def test_get_slot_pattern_on_scalar():
+    assert dotted.get({'a': 5}, 'a[*]') == ()
+    assert dotted.get({'a': (1, 2)}, 'a[*]') == (1, 2)
+
+
+def test_get_regex_numeric_and_string_keys():
+    d = {9: 'nine', '9': 'not nine', 10: 'ten'}
+    assert dotted.get(d, '/9/') == ('nine', 'not nine')
+
+
+def test_get_regex_repeated_shapes():
+    recs = [{'ab': 1, 'ac': 2, 'b': 3}, {'ac': 4, 'ab': 5, 'b': 6}, {'ab': 7, 'ac': 8, 'b': 9}]
+    assert dotted.get(recs, '[*]./a.*/') == (1, 2, 4, 5, 7, 8)
+
+
+def test_get_regex_equal_numeric_keys():
+    assert dotted.get({1: 'int'}, '/1/') == ('int',)
+    assert dotted.get({1.0: 'flt'}, '/1/') == ()
+    assert dotted.get({True: 'bool'}, '/1/') == ()
+    assert dotted.get([{1: 'a'}, {1.0: 'b'}, {True: 'c'}], '[*]./1/') == ('a',)
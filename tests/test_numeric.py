@@ -53,3 +53,19 @@ def test_numeric_expand_float():
 def test_numeric_update():
     m = dotted.update({}, '07a', 8)
     assert m == {'07a': 8}
+
+
+def test_numeric_key_on_mapping_subclass():
+    import collections
+    d = collections.OrderedDict([(1, 'a'), (2, 'b')])
+    assert dotted.get(d, '2') == 'b'
+    assert dotted.get(d, '3') is None
+
+    # equal-but-distinct keys come back as the node's own key
+    d = collections.OrderedDict([(1.0, 'x')])
+    assert dotted.expand(d, '1') == ("#'1.0'",)
+
+
+def test_numeric_key_returns_node_key():
+    assert dotted.expand({1.0: 'x'}, '1') == ("#'1.0'",)
+    assert dotted.get({1.0: 'x'}, '1') == 'x'
@@ -0,0 +1,39 @@
+import dotted
+
+
+def test_remove_pattern_from_tuple():
+    r = dotted.remove((1, 2, 3), '[*]')
+    assert r == ()
+
+    r = dotted.remove({'a': (1, 2, 3)}, 'a[/[02]/]')
+    assert r == {'a': (2,)}
+
+
+def test_remove_pattern_all_matches():
+    r = dotted.remove({'a': 1, 'b': 2, 'c': 1}, '*')
+    assert r == {}
+
+    r = dotted.remove({'a': 1, 'b': 2, 'c': 1}, '*', 1)
+    assert r == {'b': 2}
+
+
+def test_remove_slot_by_value():
+    r = dotted.remove([1, 2, 1], '[*]', 1)
+    assert r == [2]
+
+    # only the addressed slot is considered
+    r = dotted.remove([1, 2, 1], '[0]', 2)
+    assert r == [1, 2, 1]
+
+    r = dotted.remove((1, 2, 3), '[-1]')
+    assert r == (1, 2)
+
+
+def test_remove_pattern_from_str():
+    r = dotted.remove({'a': 'hello'}, 'a[/[13]/]')
+    assert r == {'a': 'hlo'}
+
+
+def test_remove_nested_negative_index_in_str():
+    r = dotted.remove('abc', '[-1][0]')
+    assert r == 'ab'
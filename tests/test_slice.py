@@ -30,3 +30,22 @@ def test_slice_match():
 
     m = dotted.match('hello[]', 'hello[:2]')
     assert m == 'hello[:2]'
+
+
+def test_slice_update_immutable():
+    m = dotted.update({'a': (1, 2, 3, 4)}, 'a[1:3]', (9,))
+    assert m == {'a': (1, 9, 4)}
+
+    m = dotted.update({'a': 'hello'}, 'a[1:3]', 'XY')
+    assert m == {'a': 'hXYlo'}
+
+    m = dotted.update({'a': (1, 2, 3, 4)}, 'a[::2]', (7, 8))
+    assert m == {'a': (7, 2, 8, 4)}
+
+
+def test_slice_remove_immutable():
+    m = dotted.remove({'a': (1, 2, 3, 4)}, 'a[1:3]')
+    assert m == {'a': (1, 4)}
+
+    m = dotted.remove({'a': 'hello'}, 'a[::2]')
+    assert m == {'a': 'el'}
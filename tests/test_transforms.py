@@ -0,0 +1,36 @@
+import pytest
+import dotted
+from dotted import elements as el
+
+
+@pytest.fixture
+def register(monkeypatch):
+    """
+    Register transforms for one test only; the generation moves forward on
+    both ends so no parsed pipeline keeps a stale resolution
+    """
+    def _register(name, fn):
+        monkeypatch.setitem(el.Dotted._registry, name, fn)
+        el.Dotted._generation += 1
+    yield _register
+    monkeypatch.undo()
+    el.Dotted._generation += 1
+
+
+def test_transform_registered_after_parse(register):
+    ops = dotted.parse('hello|late_double')
+    register('late_double', lambda val: val * 2)
+    assert dotted.get({'hello': 3}, ops) == 6
+
+
+def test_transform_reregistered_after_apply(register):
+    ops = dotted.parse('hello|late_inc')
+    register('late_inc', lambda val: val + 1)
+    assert dotted.get({'hello': 3}, ops) == 4
+    register('late_inc', lambda val: val + 10)
+    assert dotted.get({'hello': 3}, ops) == 13
+
+
+def test_transform_registrations_do_not_leak():
+    assert 'late_double' not in dotted.api.registry()
+    assert 'late_inc' not in dotted.api.registry()
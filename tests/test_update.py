@@ -10,3 +10,30 @@ def test_update_list():
 def test_update_tuple():
     r = dotted.update((), '[0]', 'hello')
     assert r == ('hello',)
+
+
+class FrozenMap(dict):
+    def __setitem__(self, key, val):
+        raise TypeError('frozen')
+
+
+def test_update_pattern_immutable_mapping():
+    r = dotted.update(FrozenMap(a=1, b=2, c=3), '/[ab]/', 0)
+    assert type(r) is FrozenMap
+    assert list(r.items()) == [('a', 0), ('b', 0), ('c', 3)]
+
+
+def test_update_tuple_index():
+    r = dotted.update((1, 2, 3), '[1]', 'x')
+    assert r == (1, 'x', 3)
+
+    r = dotted.update((1, 2, 3), '[-1]', 'x')
+    assert r == (1, 2, 'x')
+
+
+def test_update_bytes_index():
+    r = dotted.update({'a': b'ab'}, 'a[0]', b'z')
+    assert r == {'a': b'zb'}
+
+    r = dotted.update({'a': 'ab'}, 'a[1]', 'z')
+    assert r == {'a': 'az'}